@@ -1,28 +1,34 @@
-import os, django, psycopg2
+import os, django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'purchases.settings')
 django.setup()
 from django.db import connection
 
 print('ENGINE =', connection.settings_dict['ENGINE'])
-print('DATABASE_URL =', os.getenv('DATABASE_URL'))
+url = os.getenv('DATABASE_URL')
+print('DATABASE_URL =', url)
 
+# Comprobamos que la URL parsea sin abrir una segunda conexión (sin I/O de red)
+if url:
+    try:
+        from psycopg2.extensions import parse_dsn
+        parse_dsn(url)
+        print('DATABASE_URL parse: OK')
+    except Exception as e:
+        print('DATABASE_URL parse ERROR:', e)
+
+# Reutilizamos la conexión de Django para todo el diagnóstico:
+# un solo handshake TCP+auth en lugar de abrir un psycopg2.connect aparte.
 try:
-    cur = connection.cursor()
-    cur.execute('SELECT current_database(), current_user, version()')
-    print('OK ->', cur.fetchone())
+    with connection.cursor() as cur:
+        cur.execute('SELECT current_database(), current_user, version()')
+        print('OK ->', cur.fetchone())
+    with connection.cursor() as cur:
+        cur.execute('SELECT 1;')
+        print('DB OK:', cur.fetchone())
 except Exception as e:
     print('ERROR TYPE =', type(e).__name__)
     print('ERROR STR  =', str(e))
     print('ARGS       =', getattr(e, 'args', None))
     print('CAUSE      =', repr(getattr(e, '__cause__', None)))
-
-url = os.getenv("DATABASE_URL")
-print("DATABASE_URL:", url)
-try:
-    conn = psycopg2.connect(url)
-    with conn.cursor() as cur:
-        cur.execute("SELECT 1;")
-        print("DB OK:", cur.fetchone())
-    conn.close()
-except Exception as e:
-    print("DB ERROR:", e)
\ No newline at end of file
+finally:
+    connection.close()
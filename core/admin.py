@@ -25,32 +25,58 @@ class PurchaseItemInline(admin.TabularInline):
     model = PurchaseItem
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("product__category")
+
 @admin.register(Purchase)
 class PurchaseAdmin(admin.ModelAdmin):
     list_display = ("serial", "restaurant", "issue_date", "total_amount")
+    list_select_related = ("restaurant",)
     date_hierarchy = "issue_date"
     inlines = [PurchaseItemInline]
 
+    def get_queryset(self, request):
+        # El change-list no muestra notes; no cargamos el TextField
+        return super().get_queryset(request).defer("notes")
+
 class PurchaseListItemInline(admin.TabularInline):
     model = PurchaseListItem
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("product__category", "unit")
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ("name", "category", "default_unit", "ref_price")
+    list_display = ("name", "category", "default_unit", "ref_price", "unit_symbols")
+    list_select_related = ("category", "default_unit")
     search_fields = ("name",)
     list_filter = ("category",)
     filter_horizontal = ("allowed_units",)
 
+    def get_queryset(self, request):
+        # Una consulta extra en total para el M2M, en vez de una por fila
+        return super().get_queryset(request).prefetch_related("allowed_units")
+
+    @admin.display(description="Unidades permitidas")
+    def unit_symbols(self, obj):
+        return ", ".join(u.symbol or u.name for u in obj.allowed_units.all())
+
 @admin.register(PurchaseList)
 class PurchaseListAdmin(admin.ModelAdmin):
     list_display = ("series_code", "restaurant", "status", "created_at", "finalized_at")
+    list_select_related = ("restaurant", "created_by")
     list_filter = ("status", "restaurant")
     date_hierarchy = "created_at"
     inlines = [PurchaseListItemInline]
 
+    def get_queryset(self, request):
+        # El change-list no muestra notes/observation; no cargamos los TextField
+        return super().get_queryset(request).defer("notes", "observation")
+
 @admin.register(PurchaseListItem)
 class PurchaseListItemAdmin(admin.ModelAdmin):
     list_display = ("purchase_list", "product", "unit", "qty", "price_soles")
+    list_select_related = ("purchase_list__restaurant", "product__category", "unit")
     list_filter = ("unit", "product__category")
     search_fields = ("product__name",)
@@ -1,6 +1,47 @@
+from copy import copy
+
 from django.apps import AppConfig
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        _patch_serializer_get_fields()
+
+
+def _patch_serializer_get_fields():
+    """Cachea get_fields() por clase de serializer.
+
+    DRF reconstruye el dict de campos en cada instanciación; con many=True ese
+    costo se paga por ítem. Guardamos el dict generado una vez por clase y
+    devolvemos copias superficiales: DRF vuelve a hacer bind() sobre cada
+    copia, y los __init__ que reasignan querysets mutan solo su copia.
+
+    ModelSerializer trae su propio get_fields (introspección del modelo), así
+    que hay que parchear ambas implementaciones; con solo Serializer el cache
+    no aplicaría a ningún serializer de modelo.
+    """
+    from rest_framework import serializers
+
+    for ser_cls in (serializers.Serializer, serializers.ModelSerializer):
+        _install_get_fields_cache(ser_cls)
+
+
+def _install_get_fields_cache(ser_cls):
+    if getattr(ser_cls.__dict__.get('get_fields'), '_fields_cached', False):
+        return
+
+    original_get_fields = ser_cls.get_fields
+    cache = {}
+
+    def cached_get_fields(self):
+        cls = self.__class__
+        fields = cache.get(cls)
+        if fields is None:
+            fields = cache[cls] = original_get_fields(self)
+        return {name: copy(field) for name, field in fields.items()}
+
+    cached_get_fields._fields_cached = True
+    ser_cls.get_fields = cached_get_fields
@@ -10,35 +10,29 @@ def seed_owner(apps, schema_editor):
     username = 'josemaria'
     password = '123456'
 
-    # Crear/actualizar usuario con password HASHEADA (sin set_password)
-    user, created = UserModel.objects.get_or_create(
+    # Crear/actualizar usuario con password HASHEADA (sin set_password).
+    # update_or_create = un solo upsert lógico (SELECT + INSERT/UPDATE).
+    user, _ = UserModel.objects.update_or_create(
         username=username,
         defaults={
             'is_active': True,
             'password': make_password(password),
         }
     )
-    if not created:
-        # Forzar hash si ya existía con contraseña sin hash o vacía
-        user.is_active = True
-        user.password = make_password(password)
-        try:
-            user.save(update_fields=['is_active', 'password'])
-        except Exception:
-            user.save()
 
-    # Asignar ownership a todo lo existente
-    Category       = apps.get_model('core', 'Category')
-    Unit           = apps.get_model('core', 'Unit')
-    Restaurant     = apps.get_model('core', 'Restaurant')
-    Product        = apps.get_model('core', 'Product')
-    PurchaseList   = apps.get_model('core', 'PurchaseList')
-
-    Category.objects.filter(owner__isnull=True).update(owner=user)
-    Unit.objects.filter(owner__isnull=True).update(owner=user)
-    Restaurant.objects.filter(owner__isnull=True).update(owner=user)
-    Product.objects.filter(owner__isnull=True).update(owner=user)
-    PurchaseList.objects.filter(created_by__isnull=True).update(created_by=user)
+    # Asignar ownership a todo lo existente: un único UPDATE por tabla,
+    # sin cargar los modelos históricos ni despachar por el ORM.
+    for table, column in (
+        ('core_category', 'owner_id'),
+        ('core_unit', 'owner_id'),
+        ('core_restaurant', 'owner_id'),
+        ('core_product', 'owner_id'),
+        ('core_purchaselist', 'created_by_id'),
+    ):
+        schema_editor.execute(
+            f"UPDATE {table} SET {column} = %s WHERE {column} IS NULL",
+            [user.pk],
+        )
 
 class Migration(migrations.Migration):
 
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-08-30 18:10
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_remove_product_uniq_product_name_per_category_and_more'),
+    ]
+
+    # GeneratedField no admite AlterField: se elimina la columna calculada en
+    # Python y se recrea como GENERATED ALWAYS AS ... STORED.
+    operations = [
+        migrations.RemoveField(
+            model_name='purchaseitem',
+            name='line_total',
+        ),
+        migrations.AddField(
+            model_name='purchaseitem',
+            name='line_total',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', models.F('unit_price')), output_field=models.DecimalField(decimal_places=2, max_digits=12)),
+        ),
+    ]
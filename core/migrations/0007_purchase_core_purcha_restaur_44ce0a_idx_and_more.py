@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-08-30 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_alter_purchaseitem_line_total'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['restaurant', '-issue_date'], name='core_purcha_restaur_44ce0a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaselist',
+            index=models.Index(fields=['restaurant', 'status'], name='core_purcha_restaur_619e3e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchaselist',
+            index=models.Index(fields=['created_by', '-created_at'], name='core_purcha_created_f01611_idx'),
+        ),
+    ]
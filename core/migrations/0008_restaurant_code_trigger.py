@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Normaliza Restaurant.code (3 letras mayúsculas) en la propia BD para que
+# bulk_create / SQL directo no se salten la regla que antes vivía en save().
+CREATE_SQL = """
+CREATE OR REPLACE FUNCTION core_restaurant_normalize_code() RETURNS trigger AS $$
+BEGIN
+    NEW.code := upper(left(NEW.code, 3));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS restaurant_normalize_code ON core_restaurant;
+CREATE TRIGGER restaurant_normalize_code
+BEFORE INSERT OR UPDATE ON core_restaurant
+FOR EACH ROW EXECUTE FUNCTION core_restaurant_normalize_code();
+"""
+
+DROP_SQL = """
+DROP TRIGGER IF EXISTS restaurant_normalize_code ON core_restaurant;
+DROP FUNCTION IF EXISTS core_restaurant_normalize_code();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    # Solo Postgres; en sqlite (desarrollo) la API normaliza en el serializer.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_SQL)
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_purchase_core_purcha_restaur_44ce0a_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+# Índices BRIN para tablas append-mostly: casi cero almacenamiento y escaneos
+# por rango eficientes para date_hierarchy / filtros por fecha en admin.
+CREATE_SQL = """
+CREATE INDEX IF NOT EXISTS purchaselist_created_at_brin
+    ON core_purchaselist USING BRIN (created_at);
+CREATE INDEX IF NOT EXISTS purchase_issue_date_brin
+    ON core_purchase USING BRIN (issue_date);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS purchaselist_created_at_brin;
+DROP INDEX IF EXISTS purchase_issue_date_brin;
+"""
+
+
+def create_indexes(apps, schema_editor):
+    # BRIN solo existe en Postgres; en sqlite (desarrollo) no hace falta.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(CREATE_SQL)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_restaurant_code_trigger'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-08-30 18:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_brin_timestamp_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='purchaselist',
+            name='series_code',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='purchaselist',
+            index=models.Index(condition=models.Q(('status', 'final')), fields=['series_code'], name='idx_plist_series_final'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-08-30 18:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_alter_purchaselist_series_code_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaselist',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-08-30 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_purchaselist_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerialCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=40, unique=True)),
+                ('seq', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -5,11 +5,20 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
+# Constantes compartidas: evitan re-parsear los literales en cada llamada
+ZERO = Decimal("0")
+ZERO_2DP = Decimal("0.00")
+ONE_CENT = Decimal("0.01")
+
 # -----------------------------------
 # Catálogo de Unidades
 # -----------------------------------
@@ -41,6 +50,27 @@ class Unit(models.Model):
             ),
         ]
 
+    # Cache de proceso {ids de unidades monetarias}; evita un SELECT por ítem
+    # al validar. Se invalida al guardar/borrar cualquier unidad.
+    _currency_ids_cache = None
+
+    @classmethod
+    def currency_ids(cls):
+        """Ids de unidades con is_currency=True (frozenset cacheado)."""
+        if cls._currency_ids_cache is None:
+            cls._currency_ids_cache = frozenset(
+                cls.objects.filter(is_currency=True).values_list("id", flat=True)
+            )
+        return cls._currency_ids_cache
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Unit._currency_ids_cache = None
+
+    def delete(self, *args, **kwargs):
+        super().delete(*args, **kwargs)
+        Unit._currency_ids_cache = None
+
     def __str__(self) -> str:
         return self.name
 
@@ -87,11 +117,9 @@ class Restaurant(models.Model):
             ),
         ]
 
-    def save(self, *args, **kwargs):
-        # Normalizamos a 3 letras mayúsculas
-        if self.code:
-            self.code = self.code.upper()[:3]
-        super().save(*args, **kwargs)
+    # La normalización a 3 letras mayúsculas la hace un trigger BEFORE INSERT/UPDATE
+    # en Postgres (migración 0008); así bulk_create no se salta la regla.
+    # En la API, RestaurantSerializer.validate_code cubre los backends sin trigger.
 
     def __str__(self) -> str:
         return f"{self.name} ({self.code})"
@@ -148,6 +176,9 @@ class Purchase(models.Model):
 
     class Meta:
         ordering = ["-issue_date"]
+        indexes = [
+            models.Index(fields=["restaurant", "-issue_date"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.serial} - {self.restaurant.name}"
@@ -161,33 +192,110 @@ class PurchaseItem(models.Model):
     quantity = models.DecimalField(
         max_digits=10,
         decimal_places=2,
-        validators=[MinValueValidator(Decimal("0.01"))],
+        validators=[MinValueValidator(ONE_CENT)],
     )
     unit_price = models.DecimalField(
         max_digits=12,
         decimal_places=2,
-        validators=[MinValueValidator(Decimal("0.00"))],
+        validators=[MinValueValidator(ZERO_2DP)],
+    )
+    # Calculado por la BD (GENERATED ALWAYS AS ... STORED); compatible con bulk_create
+    line_total = models.GeneratedField(
+        expression=models.F("quantity") * models.F("unit_price"),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
     )
-    line_total = models.DecimalField(max_digits=12, decimal_places=2, editable=False)
-
-    def save(self, *args, **kwargs):
-        self.line_total = (self.quantity or Decimal("0")) * (self.unit_price or Decimal("0"))
-        super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.product.name} x {self.quantity}"
 
 
+def _bump_config_version(sender, instance, **kwargs):
+    # Invalida el payload cacheado de /config/ del dueño del catálogo:
+    # el GET siguiente reconstruye bajo una clave con versión nueva.
+    from django.core.cache import cache
+
+    owner_id = getattr(instance, "owner_id", None)
+    if owner_id:
+        try:
+            cache.incr(f"cfg:ver:{owner_id}")
+        except ValueError:
+            cache.set(f"cfg:ver:{owner_id}", 1, None)
+
+
+for _catalog_model in (Restaurant, Category, Product, Unit):
+    post_save.connect(_bump_config_version, sender=_catalog_model)
+    post_delete.connect(_bump_config_version, sender=_catalog_model)
+
+
+@receiver(post_save, sender=PurchaseItem)
+@receiver(post_delete, sender=PurchaseItem)
+def _refresh_purchase_total(sender, instance, **kwargs):
+    # total_amount = SUM(line_total) en un solo UPDATE atómico; evita el
+    # read-modify-write en Python y las carreras entre escrituras concurrentes.
+    Purchase.objects.filter(pk=instance.purchase_id).update(
+        total_amount=Coalesce(
+            Subquery(
+                PurchaseItem.objects
+                .filter(purchase_id=OuterRef("pk"))
+                .values("purchase_id")
+                .annotate(t=Sum("line_total"))
+                .values("t")
+            ),
+            ZERO_2DP,
+        )
+    )
+
+
+class SerialCounter(models.Model):
+    """Contador atómico por prefijo de serie (p.ej. "2026-ALP-" o "ALP-202608-").
+
+    Sustituye el COUNT/ORDER BY sobre la tabla completa al emitir números:
+    un UPDATE indexado con F('seq') + 1 bajo lock de fila.
+    """
+    scope = models.CharField(max_length=40, unique=True)
+    seq = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.scope}{self.seq:04d}"
+
+
 # -----------------------------------
 # Listas de compra
 # -----------------------------------
+class PurchaseListQuerySet(models.QuerySet):
+    def with_full_tree(self):
+        """Precarga restaurant/created_by e ítems con unit y product.
+
+        Deja cualquier render de la lista (PDF, export) en 2-3 consultas.
+        Los ítems se proyectan a las columnas que lee el serializer anidado;
+        las acciones (PDF, export) construyen sus propios querysets.
+        """
+        return self.select_related("restaurant", "created_by").prefetch_related(
+            models.Prefetch(
+                "items",
+                queryset=(
+                    PurchaseListItem.objects
+                    .select_related("unit", "product")
+                    .only(
+                        "purchase_list", "qty", "price_soles",
+                        "product__name",
+                        "unit__name", "unit__symbol", "unit__is_currency",
+                    )
+                ),
+            )
+        )
+
+
 class PurchaseList(models.Model):
     STATUS = (("draft", "Draft"), ("final", "Final"))
 
     restaurant = models.ForeignKey(
         Restaurant, on_delete=models.PROTECT, related_name="lists"
     )
-    series_code = models.CharField(max_length=20, blank=True, null=True, db_index=True)
+    # Solo se llena al finalizar; el índice parcial (status='final') evita
+    # indexar los borradores con serie vacía
+    series_code = models.CharField(max_length=20, blank=True, null=True)
     status = models.CharField(max_length=10, choices=STATUS, default="draft")
     notes = models.TextField(blank=True, null=True)         # notas generales (PDF)
     observation = models.TextField(blank=True, null=True)   # observación interna
@@ -195,15 +303,41 @@ class PurchaseList(models.Model):
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     finalized_at = models.DateTimeField(blank=True, null=True)
 
+    objects = PurchaseListQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["restaurant", "status"]),
+            models.Index(fields=["created_by", "-created_at"]),
+            models.Index(
+                fields=["series_code"],
+                name="idx_plist_series_final",
+                condition=models.Q(status="final"),
+            ),
+        ]
+
+    def validate_for_finalization(self):
+        """Valida en una sola consulta (EXISTS) que ningún ítem no monetario
+        quede sin price_soles; evita iterar y llamar clean() por ítem."""
+        if self.items.filter(unit__is_currency=False, price_soles__isnull=True).exists():
+            raise ValidationError(
+                "price_soles es obligatorio para unidades no monetarias al finalizar la lista."
+            )
 
     def __str__(self) -> str:
         return f"{self.series_code or 'DRAFT'} - {self.restaurant.code}"
 
 
+class PurchaseListItemQuerySet(models.QuerySet):
+    def with_related(self):
+        """Precarga unit/product/purchase_list para iterar ítems sin N+1."""
+        return self.select_related("unit", "product__category", "purchase_list")
+
+
 class PurchaseListItem(models.Model):
     purchase_list = models.ForeignKey(
         PurchaseList, on_delete=models.CASCADE, related_name="items"
@@ -215,6 +349,8 @@ class PurchaseListItem(models.Model):
     qty = models.DecimalField(max_digits=12, decimal_places=2)
     price_soles = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
 
+    objects = PurchaseListItemQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["purchase_list", "product"]),
@@ -222,9 +358,10 @@ class PurchaseListItem(models.Model):
 
     def clean(self):
         # Validaciones coherentes según tipo de unidad
-        if self.unit and self.unit.is_currency:
+        # (consulta el cache de ids monetarios; no dereferencia el FK)
+        if self.unit_id and self.unit_id in Unit.currency_ids():
             # Moneda: qty = importe; price_soles no debe venir (>0 tampoco)
-            if self.price_soles not in (None, Decimal("0"), Decimal("0.00")):
+            if self.price_soles not in (None, ZERO, ZERO_2DP):
                 raise ValidationError(
                     "Para unidad monetaria, no debe enviarse price_soles (use solo qty como importe)."
                 )
@@ -239,13 +376,24 @@ class PurchaseListItem(models.Model):
 
     @property
     def subtotal_soles(self):
+        # Nota: al iterar muchos ítems, cargarlos con .with_related() para
+        # que unit/purchase_list ya estén en memoria (evita un SELECT por fila).
         # Si la unidad es monetaria, el subtotal ES la cantidad
         if self.unit and getattr(self.unit, "is_currency", False):
-            return self.qty or Decimal('0')
+            return self.qty or ZERO
         # Si no es monetaria, multiplicamos con tolerancia a None
-        q = self.qty or Decimal('0')
-        p = self.price_soles or Decimal('0')
+        q = self.qty or ZERO
+        p = self.price_soles or ZERO
         return q * p
 
     def __str__(self) -> str:
         return f"{self.product.name} ({self.unit.name})"
+
+
+@receiver(post_save, sender=PurchaseListItem)
+@receiver(post_delete, sender=PurchaseListItem)
+def _touch_purchase_list(sender, instance, **kwargs):
+    # Los ítems no tienen timestamp propio: cualquier escritura (API, admin
+    # inline, ORM) toca updated_at de la lista para que el ETag del listado
+    # se invalide por todos los caminos, no solo por los del viewset.
+    PurchaseList.objects.filter(pk=instance.purchase_list_id).update(updated_at=timezone.now())
@@ -0,0 +1,40 @@
+# core/renderers.py
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson  # opcional: encode JSON en C, varias veces más rápido
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj):
+    """Tipos que orjson no maneja nativo, con la misma forma que el encoder de DRF."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    raise TypeError(f"Objeto no serializable a JSON: {type(obj).__name__}")
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer de DRF con encode vía orjson cuando está instalado.
+    Si orjson falta (entorno de desarrollo) o se pide salida con indent
+    (Browsable API), cae al renderer clásico sin cambio de comportamiento.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        # OPT_UTC_Z: datetimes UTC con sufijo 'Z' como el encoder de DRF;
+        # OPT_NON_STR_KEYS: tolera claves int en dicts intermedios.
+        return orjson.dumps(
+            data,
+            default=_json_default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
@@ -1,7 +1,33 @@
 # core/services.py
 from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
 
+from .models import Purchase, SerialCounter
+
+
+def _next_seq(scope: str, seed) -> int:
+    """Incrementa y devuelve el contador del prefijo `scope` de forma atómica.
+
+    `seed` es un callable que calcula el valor inicial la primera vez que
+    aparece el prefijo (para no repetir números emitidos antes del contador).
+    Un UPDATE indexado con F('seq') + 1 bajo lock de fila, en lugar de
+    contar/escanear las filas ya emitidas en cada asignación.
+    """
+    with transaction.atomic():
+        counter, created = SerialCounter.objects.select_for_update().get_or_create(scope=scope)
+        if created:
+            # Persistir semilla + 1 con un valor concreto: un F('seq') + 1
+            # posterior pisaría la asignación y recalcularía desde el default 0
+            counter.seq = seed() + 1
+            counter.save(update_fields=["seq"])
+            return counter.seq
+        counter.seq = F("seq") + 1
+        counter.save(update_fields=["seq"])
+        counter.refresh_from_db(fields=["seq"])
+        return counter.seq
+
+
 def generate_series_code(restaurant_code: str, model_cls, year=None):
     """
     Genera un código de serie único tipo YYYY-XXX-####.
@@ -10,14 +36,40 @@ def generate_series_code(restaurant_code: str, model_cls, year=None):
     - year: por defecto el año actual.
     """
     year = year or timezone.now().year
-    with transaction.atomic():
-        base_qs = model_cls.objects.select_for_update().filter(
-            restaurant__code=restaurant_code,
-            created_at__year=year
-        )
-        seq = base_qs.count() + 1
-        return f"{year}-{restaurant_code}-{seq:04d}"
+    prefix = f"{year}-{restaurant_code}-"
+
+    def seed():
+        return model_cls.objects.filter(
+            restaurant__code=restaurant_code, created_at__year=year
+        ).count()
+
+    seq = _next_seq(prefix, seed)
+    return f"{prefix}{seq:04d}"
+
 
 def next_serial_for(model_cls, restaurant_code, year=None):
     # Alias simple para mantener compatibilidad con serializers
-    return generate_series_code(restaurant_code=restaurant_code, model_cls=model_cls, year=year)
\ No newline at end of file
+    return generate_series_code(restaurant_code=restaurant_code, model_cls=model_cls, year=year)
+
+
+def next_purchase_serial(restaurant, issue_date):
+    """
+    Serial mensual de Purchase tipo CODE-YYYYMM-#### sobre el mismo contador.
+    (Antes vivía en core/services/serials.py, que quedaba inimportable porque
+    este módulo sombrea al directorio.)
+    """
+    period = issue_date.strftime('%Y%m')
+    prefix = f"{restaurant.code}-{period}-"
+
+    def seed():
+        # Primera emisión con contador: arrancar desde el último serial emitido
+        last = (
+            Purchase.objects
+            .filter(restaurant=restaurant, serial__startswith=prefix)
+            .order_by('serial')
+            .values_list('serial', flat=True)
+            .last()
+        )
+        return int(last.split('-')[-1]) if last else 0
+
+    return f"{prefix}{_next_seq(prefix, seed):04d}"
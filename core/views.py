@@ -2,7 +2,8 @@ from django.utils import timezone
 from django.template.loader import render_to_string
 from django.http import HttpResponse
 
-from django.db.models import Max
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, Max, Prefetch, Sum, When
+from django.db.models.functions import Round
 from django.db.models.deletion import ProtectedError
 from django.db import IntegrityError
 
@@ -13,13 +14,16 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
-from datetime import date as date_cls
+from datetime import date as date_cls, timedelta
+import hashlib
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal, ROUND_HALF_UP
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 
 from .models import (
-    Category, Product, Restaurant, Purchase,
+    Category, Product, Restaurant, Purchase, PurchaseItem,
     PurchaseList, PurchaseListItem, Unit
 )
 from .serializers import (
@@ -28,6 +32,11 @@ from .serializers import (
     ChangePasswordSerializer, PurchaseListItemPatchSerializer
 )
 
+# Constantes Decimal reutilizadas por los reportes y el PDF: evita construir
+# Decimal("0.01")/Decimal("0") desde string en cada fila de los bucles calientes.
+_Q01 = Decimal("0.01")
+_D0 = Decimal("0")
+
 # ---------------- Cambio de contraseña ----------------
 class ChangePasswordView(APIView):
     permission_classes = [IsAuthenticated]
@@ -86,19 +95,46 @@ class AuthConfigView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    # Sin CACHES compartido configurado, Django usa LocMemCache por proceso:
+    # el bump de versión solo lo ve el worker que atendió la escritura, así
+    # que el TTL corto acota la frescura en los demás workers de gunicorn.
+    # Con un backend compartido (Redis/memcached) puede subirse sin riesgo.
+    CACHE_TTL = 5
+
     def get(self, request):
         user = request.user
-        restaurants = Restaurant.objects.filter(owner=user).order_by("name")
-        categories  = Category.objects.filter(owner=user).order_by("name")
-        products    = Product.objects.select_related("category").filter(owner=user).order_by("name")
-        units       = Unit.objects.filter(owner=user).order_by("name")
-
-        return Response({
-            "restaurants": RestaurantSerializer(restaurants, many=True).data,
-            "categories":  CategorySerializer(categories, many=True).data,
-            "products":    ProductSerializer(products, many=True).data,
-            "units":       UnitSerializer(units, many=True).data,
-        })
+        # Payload cacheado bajo clave versionada: las señales de los modelos
+        # de catálogo suben la versión al escribir, así que un hit sirve
+        # directo de cache sin tocar la BD ni serializar.
+        ver = cache.get(f"cfg:ver:{user.id}", 0)
+        key = f"cfg:payload:{user.id}:{ver}"
+        payload = cache.get(key)
+        if payload is None:
+            # Dicts planos de .values(): sin instanciar modelos ni serializers;
+            # el join de category/default_unit va inline en la misma consulta
+            products = [
+                {
+                    "id": p["id"], "name": p["name"],
+                    "category": p["category_id"], "category_name": p["category__name"],
+                    "default_unit": p["default_unit_id"], "default_unit_name": p["default_unit__name"],
+                    "ref_price": str(p["ref_price"]) if p["ref_price"] is not None else None,
+                }
+                for p in Product.objects.filter(owner=user).order_by("name").values(
+                    "id", "name", "category_id", "category__name",
+                    "default_unit_id", "default_unit__name", "ref_price",
+                )
+            ]
+            payload = {
+                "restaurants": list(Restaurant.objects.filter(owner=user).order_by("name")
+                                    .values("id", "name", "code", "address", "contact", "created_at")),
+                "categories":  list(Category.objects.filter(owner=user).order_by("name")
+                                    .values("id", "name", "created_at")),
+                "products":    products,
+                "units":       list(Unit.objects.filter(owner=user).order_by("name")
+                                    .values("id", "name", "kind", "symbol", "is_currency", "created_at")),
+            }
+            cache.set(key, payload, self.CACHE_TTL)
+        return Response(payload)
 
 
 class PublicConfigAPIView(APIView):
@@ -122,14 +158,20 @@ class PublicConfigAPIView(APIView):
 
 # --------- Catálogo (aislado por usuario) ----------
 class CategoryViewSet(OwnedQuerysetMixin, viewsets.ModelViewSet):
-    queryset = Category.objects.all().order_by("name")
+    # .only() proyecta solo las columnas que expone el serializer
+    queryset = Category.objects.only("id", "name", "created_at").order_by("name")
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
     class Meta:
         model = Category
 
 class ProductViewSet(OwnedQuerysetMixin, viewsets.ModelViewSet):
-    queryset = Product.objects.select_related("category").all().order_by("name")
+    queryset = (Product.objects
+                .select_related("category", "default_unit")
+                .only("id", "name", "ref_price",
+                      "category__id", "category__name",
+                      "default_unit__id", "default_unit__name")
+                .order_by("name"))
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
     class Meta:
@@ -137,7 +179,7 @@ class ProductViewSet(OwnedQuerysetMixin, viewsets.ModelViewSet):
 
 
 class UnitViewSet(viewsets.ModelViewSet):
-    queryset = Unit.objects.all().order_by("name")
+    queryset = Unit.objects.only("id", "name", "kind", "symbol", "is_currency", "created_at").order_by("name")
     serializer_class = UnitSerializer
 
     def destroy(self, request, *args, **kwargs):
@@ -167,7 +209,7 @@ class UnitViewSet(viewsets.ModelViewSet):
             return Response({"detail": detail}, status=status.HTTP_409_CONFLICT)
 
 class RestaurantViewSet(OwnedQuerysetMixin, viewsets.ModelViewSet):
-    queryset = Restaurant.objects.all().order_by("name")
+    queryset = Restaurant.objects.only("id", "name", "code", "address", "contact", "created_at").order_by("name")
     serializer_class = RestaurantSerializer
     permission_classes = [IsAuthenticated]
     class Meta:
@@ -176,7 +218,9 @@ class RestaurantViewSet(OwnedQuerysetMixin, viewsets.ModelViewSet):
 
 # --------------- Compras formales (futuro) ---------------
 class PurchaseViewSet(viewsets.ModelViewSet):
-    queryset = Purchase.objects.prefetch_related('items').all()
+    queryset = (Purchase.objects
+                .select_related('restaurant')
+                .prefetch_related(Prefetch('items', queryset=PurchaseItem.objects.select_related('product'))))
     serializer_class = PurchaseSerializer
     permission_classes = [DefaultPerm]
 
@@ -217,17 +261,25 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import PurchaseListItem
-from .serializers import PurchaseListItemSerializer, PurchaseListItemPatchSerializer
+from .serializers import PurchaseListItemSerializer, PurchaseListItemPatchSerializer, _dec2
 
 class PurchaseListItemViewSet(viewsets.ModelViewSet):
-    queryset = PurchaseListItem.objects.select_related(
-        'product__category', 'unit', 'purchase_list'
-    )
+    queryset = PurchaseListItem.objects.with_related()
     permission_classes = [IsAuthenticated]
     http_method_names = ['get', 'patch', 'head', 'options']
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        # El subtotal lo calcula la BD; el serializer lo lee de la anotación
+        qs = super().get_queryset().annotate(
+            subtotal_soles_db=Case(
+                When(unit__is_currency=True, then=F('qty')),
+                default=ExpressionWrapper(
+                    F('qty') * F('price_soles'),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+        )
         pl = self.request.query_params.get('purchase_list')
         if pl:
             qs = qs.filter(purchase_list_id=pl)
@@ -238,6 +290,34 @@ class PurchaseListItemViewSet(viewsets.ModelViewSet):
             return PurchaseListItemPatchSerializer
         return PurchaseListItemSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Fast-path de solo lectura: filas planas de .values() sin instanciar
+        # modelos ni serializer. El formato replica al serializer del detalle
+        # (decimales como str de 2 decimales, subtotal como número).
+        rows = self.filter_queryset(self.get_queryset()).values(
+            'id', 'purchase_list_id',
+            'product_id', 'product__name',
+            'unit_id', 'unit__name', 'unit__is_currency', 'unit__symbol',
+            'qty', 'price_soles', 'subtotal_soles_db',
+        )
+        data = [
+            {
+                'id': r['id'],
+                'purchase_list': r['purchase_list_id'],
+                'product': r['product_id'],
+                'product_name': r['product__name'],
+                'unit': r['unit_id'],
+                'unit_name': r['unit__name'],
+                'unit_is_currency': r['unit__is_currency'],
+                'unit_symbol': r['unit__symbol'],
+                'qty': str(r['qty']) if r['qty'] is not None else None,
+                'price_soles': str(r['price_soles']) if r['price_soles'] is not None else None,
+                'subtotal_soles': _dec2(r['subtotal_soles_db']),
+            }
+            for r in rows
+        ]
+        return Response(data)
+
     def partial_update(self, request, *args, **kwargs):
         kwargs['partial'] = True
         instance = self.get_object()
@@ -248,6 +328,7 @@ class PurchaseListItemViewSet(viewsets.ModelViewSet):
         self.perform_update(serializer)
 
         # 2) si la lista no es final, verificar si ya no quedan ítems sin precio
+        # (el post_save del ítem ya tocó updated_at de la lista)
         pl = instance.purchase_list
         if pl.status != 'final':
             # ¿existe algún ítem NO monetario sin precio?
@@ -297,6 +378,34 @@ class PassthroughNegotiation(BaseContentNegotiation):
         renderer = renderers[0]
         return (renderer, renderer.media_type)
 
+
+# FontConfiguration de WeasyPrint compartida entre renders: cargar las fuentes
+# es el costo fijo más grande de cada PDF y el objeto es reutilizable.
+# Init perezoso para no pagar el import en workers que nunca generan PDF.
+_WEASY_FONT_CFG = None
+
+def _weasy_font_config():
+    global _WEASY_FONT_CFG
+    if _WEASY_FONT_CFG is None:
+        from weasyprint.text.fonts import FontConfiguration
+        _WEASY_FONT_CFG = FontConfiguration()
+    return _WEASY_FONT_CFG
+
+
+# Pool mínimo para solapar la precarga de WeasyPrint con la consulta del
+# reporte; compartido a nivel de módulo para no crear un pool por request.
+_WARM_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-warm")
+
+def _warm_weasyprint():
+    """Importa WeasyPrint y arma la FontConfiguration compartida por adelantado."""
+    try:
+        import weasyprint  # noqa: F401
+        _weasy_font_config()
+    except Exception:
+        # Sin WeasyPrint instalado el render cae a xhtml2pdf igual que siempre
+        pass
+
+
 # --------------- Listas (aisladas por usuario) ---------------
 class PurchaseListViewSet(viewsets.ModelViewSet):
     queryset = PurchaseList.objects.all()
@@ -312,8 +421,6 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
         except Exception:
             rest_id_int = None
         if rest_id_int:
-            from django.utils import timezone
-            from datetime import timedelta
             now = timezone.now()
             qs = (PurchaseList.objects
                   .filter(created_by=user, restaurant_id=rest_id_int, status='draft')
@@ -342,12 +449,13 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
         if pl.status == 'final':
             return Response({'ok': True, 'status': 'final'}, status=status.HTTP_200_OK)
 
-        items = pl.items.select_related('unit').all()
-        if not items.exists():
+        if not pl.items.exists():
             return Response({'detail': 'La lista no tiene ítems.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        faltantes = [it.id for it in items
-                    if not getattr(it.unit, 'is_currency', False) and it.price_soles is None]
+        # Una sola consulta (JOIN a core_unit) en lugar de iterar ítem por ítem
+        faltantes = list(pl.items
+                         .filter(unit__is_currency=False, price_soles__isnull=True)
+                         .values_list('id', flat=True))
         if faltantes:
             return Response({'detail': 'Hay ítems sin precio.', 'missing_item_ids': faltantes},
                             status=status.HTTP_400_BAD_REQUEST)
@@ -390,31 +498,48 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
     serializer_class = PurchaseListSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    # Acciones que no serializan los items anidados: el prefetch sería
+    # tráfico desperdiciado (el PDF arma su propia consulta plana).
+    _NO_ITEMS_ACTIONS = ("pdf", "complete", "destroy")
+
     def get_queryset(self):
         user = self.request.user
-        return (PurchaseList.objects
-                .filter(created_by=user)
-                .prefetch_related('items__product__category', 'items__unit', 'restaurant')
-                .order_by('-id'))
+        if self.action in self._NO_ITEMS_ACTIONS:
+            base = PurchaseList.objects.select_related("restaurant", "created_by")
+        else:
+            base = PurchaseList.objects.with_full_tree()
+        return base.filter(created_by=user).order_by('-id')
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        """Listado con ETag: si el cliente ya tiene la versión vigente,
+        respondemos 304 sin serializar nada."""
+        qs = self.filter_queryset(self.get_queryset())
+        agg = qs.aggregate(m=Max('updated_at'), c=Count('id'))
+        etag = '"%s"' % hashlib.md5(
+            f"{agg['m']}:{agg['c']}:{request.user.id}".encode()
+        ).hexdigest()
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        resp = super().list(request, *args, **kwargs)
+        resp['ETag'] = etag
+        return resp
+
     # ---------- Helpers internos (NO @action) ----------
     def _ensure_complete_prices(self, pl: PurchaseList):
         """Verifica que todos los ítems no monetarios tengan price_soles."""
-        missing = []
-        for it in pl.items.select_related("unit", "product").all():
-            if it.unit and not it.unit.is_currency:
-                if it.price_soles in (None,):
-                    missing.append(it.product.name)
+        missing = list(pl.items
+                       .filter(unit__is_currency=False, price_soles__isnull=True)
+                       .values_list("product__name", flat=True))
         if missing:
             msg = "Faltan precios en: " + ", ".join(missing[:10])
             raise ValidationError(msg if len(missing) <= 10 else msg + f" y {len(missing)-10} más")
 
     def _render_pdf_html(self, request, pl: PurchaseList, show_prices: bool = True, category_ids=None, category_names=None):
         """Construye el HTML del PDF agrupando por categoría con decimales correctos."""
-        items_qs = pl.items.select_related("product__category", "unit").all()
+        items_qs = pl.items.all()
 
         # Filtrar por categorías si se enviaron
         if category_ids:
@@ -431,28 +556,36 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
 
         # --- Construcción del PDF (ahora SIEMPRE se ejecuta) ---
         groups_map = {}   # {category_name: [line, ...]}
-        grand_total = Decimal("0.00")
-
-        for it in items_qs:
-            cat = getattr(getattr(it.product, "category", None), "name", "Sin categoría")
+        grand_total = _D0
+
+        # Filas planas de .values(): el loop solo lee escalares, así que no
+        # materializamos el grafo producto/categoría/unidad por ítem
+        rows = items_qs.values(
+            "product__name", "product__category__name",
+            "unit__name", "unit__symbol", "unit__is_currency",
+            "qty", "price_soles",
+        )
+        for it in rows:
+            cat = it["product__category__name"] or "Sin categoría"
 
-            price = (it.price_soles or Decimal("0"))
-            qty   = (it.qty or Decimal("0"))
-            raw_subtotal = qty if (getattr(it.unit, "is_currency", False)) else (qty * price)
-            subtotal = raw_subtotal.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            price = (it["price_soles"] or _D0)
+            qty   = (it["qty"] or _D0)
+            is_curr = bool(it["unit__is_currency"])
+            raw_subtotal = qty if is_curr else (qty * price)
+            subtotal = raw_subtotal.quantize(_Q01, rounding=ROUND_HALF_UP)
 
             grand_total += subtotal
 
-            ulabel = (getattr(it.unit, "symbol", None) or getattr(it.unit, "name", "")) or "-"
+            ulabel = (it["unit__symbol"] or it["unit__name"] or "") or "-"
 
             line = {
-                "product": it.product.name,
+                "product": it["product__name"],
                 "unit": ulabel,
                 "qty": float(qty),
-                "price": None if (getattr(it.unit, "is_currency", False) or not show_prices)
-                        else float(price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+                "price": None if (is_curr or not show_prices)
+                        else float(price.quantize(_Q01, rounding=ROUND_HALF_UP)),
                 "subtotal": float(subtotal),
-                "unit_is_currency": bool(getattr(it.unit, "is_currency", False)),
+                "unit_is_currency": is_curr,
             }
             groups_map.setdefault(cat, []).append(line)
 
@@ -463,15 +596,15 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
             lines = groups_map[cat_name]
             flat_lines.extend(lines)
             group_total_dec = sum(Decimal(str(l["subtotal"])) for l in lines)
-            group_total = float(group_total_dec.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+            group_total = float(group_total_dec.quantize(_Q01, rounding=ROUND_HALF_UP))
             groups.append({"category": cat_name, "lines": lines, "group_total": group_total})
 
         ctx = {
             "pl": pl,
             "groups": groups,
-            "grand_total": format(grand_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP), ".2f"),
+            "grand_total": format(grand_total.quantize(_Q01, rounding=ROUND_HALF_UP), ".2f"),
             "lines": flat_lines,
-            "total": format(grand_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP), ".2f"),
+            "total": format(grand_total.quantize(_Q01, rounding=ROUND_HALF_UP), ".2f"),
             "show_prices": show_prices,
             "observation": (pl.observation or ""),
         }
@@ -489,7 +622,9 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
         # 1) WeasyPrint
         try:
             from weasyprint import HTML  # import perezoso
-            return HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
+            return HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf(
+                font_config=_weasy_font_config()
+            )
         except Exception as e:
         # Agrega logging opcional para detectar fallas reales
             print(f"[PDF Error] WeasyPrint failed: {e}")
@@ -573,7 +708,7 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
             return Response(ser.errors, status=400)
 
         try:
-            obj = ser.save(purchase_list=pl)
+            obj = ser.save(purchase_list=pl)  # post_save del ítem invalida el ETag
         except ValidationError as e:
             return Response({"detail": str(e)}, status=400)
         except Exception as e:
@@ -597,7 +732,9 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
         # Observación
         if obs is not None:
             pl.observation = str(obs).strip() or None
-            pl.save(update_fields=["observation"])
+            # auto_now solo refresca si va en update_fields; sin updated_at
+            # el ETag del listado no cambiaría
+            pl.save(update_fields=["observation", "updated_at"])
 
         # Actualizar precios
         updated = 0
@@ -620,6 +757,7 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
                 updated += 1
 
         # Finalizar si está completo
+        # (los saves de ítems ya tocaron updated_at de la lista vía post_save)
         try:
             self._ensure_complete_prices(pl)
         except ValidationError:
@@ -630,7 +768,7 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
         if not pl.series_code:
             pl.series_code = self._next_series_code(pl.restaurant)
 
-        pl.save(update_fields=["status", "finalized_at", "series_code"])
+        pl.save(update_fields=["status", "finalized_at", "series_code", "updated_at"])
         return Response(
             {"detail": f"Lista completada y finalizada. ({updated} ítems actualizados)",
              "id": pl.id, "series_code": pl.series_code},
@@ -667,13 +805,24 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
         cat_ids = [x.strip() for x in str(cat_ids).split(",") if x.strip()]
         cat_names = [x.strip() for x in str(cat_names).split(",") if x.strip()]
 
-        try:
-            pdf_bytes = self._render_pdf_bytes(
-                request, pl, show_prices=show_prices,
-                category_ids=cat_ids or None, category_names=cat_names or None
-            )
-        except Exception:
-            pdf_bytes = None
+        # Una lista finalizada es inmutable: su PDF se cachea indefinidamente
+        # por (lista, finalized_at, opciones de render); los borradores solo 60 s.
+        ts = int(pl.finalized_at.timestamp()) if pl.finalized_at else "draft"
+        variant = f"{int(show_prices)}:{','.join(cat_ids)}:{','.join(cat_names)}"
+        cache_key = "pl_pdf:%s:%s:%s" % (pl.pk, ts, hashlib.md5(variant.encode()).hexdigest())
+        pdf_bytes = cache.get(cache_key)
+        if pdf_bytes is None:
+            try:
+                pdf_bytes = self._render_pdf_bytes(
+                    request, pl, show_prices=show_prices,
+                    category_ids=cat_ids or None, category_names=cat_names or None
+                )
+            except Exception:
+                pdf_bytes = None
+            # No cachear el PDF centinela que devuelve el fallback de render:
+            # un fallo transitorio no debe quedar congelado en el cache
+            if pdf_bytes and pdf_bytes != b"%PDF-1.4\n%":
+                cache.set(cache_key, pdf_bytes, None if pl.status == "final" else 60)
 
         if not pdf_bytes:
             # dummy pdf mínimo — evita que DRF/edge creen JSON y activen 406
@@ -703,37 +852,32 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
 
         only_final = request.query_params.get("only_final", "true").lower() != "false"
 
-        qs = (PurchaseList.objects
-              .select_related("restaurant")
-              .prefetch_related("items__product__category", "items__unit")
-              .filter(created_by=request.user, created_at__date=d))
+        qs = PurchaseList.objects.filter(created_by=request.user, created_at__date=d)
         if only_final:
             qs = qs.filter(status="final")
 
-        if not qs.exists():
-            return Response([], status=200)
-
-        # Tomamos la lista más reciente por restaurante (si hay varias)
-        latest_by_rest = {}
-        for pl in qs.order_by("restaurant__name", "id"):
-            rid = pl.restaurant_id
-            if rid not in latest_by_rest or pl.id > latest_by_rest[rid].id:
-                latest_by_rest[rid] = pl
+        # La lista más reciente por restaurante (si hay varias), resuelta en SQL:
+        # max(id) por restaurante y luego una sola consulta con JOIN a restaurant.
+        latest_ids = qs.values("restaurant_id").annotate(last_id=Max("id")).values("last_id")
+        latest = (PurchaseList.objects
+                  .filter(id__in=latest_ids)
+                  .select_related("restaurant")
+                  .only("id", "series_code", "status", "created_at", "restaurant__name")
+                  .order_by("restaurant__name"))
 
         rows = []
         base = request.build_absolute_uri("/")[:-1]  # quita la última '/'
-        for rid, pl in latest_by_rest.items():
+        pdf_prefix = base + "/api/purchase-lists/"   # prefijo fijo, una sola vez
+        for pl in latest:
             rows.append({
-                "restaurant_id": rid,
+                "restaurant_id": pl.restaurant_id,
                 "restaurant_name": pl.restaurant.name,
                 "list_id": pl.id,
                 "series_code": pl.series_code,
                 "status": pl.status,
                 "created_at": pl.created_at,
-                "pdf_url": f"{base}/api/purchase-lists/{pl.id}/pdf/",
+                "pdf_url": pdf_prefix + str(pl.id) + "/pdf/",
             })
-
-        rows.sort(key=lambda r: r["restaurant_name"] or "")
         return Response(rows, status=200)
 
     # ---------- Reporte consolidado por rango (con filtros opcionales) ----------
@@ -752,15 +896,12 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
           }
         """
         qs_lists = (PurchaseList.objects
-                    .select_related("restaurant")
                     .filter(created_by=self.request.user,
                             created_at__date__gte=sdate, created_at__date__lte=edate))
         if only_final:
             qs_lists = qs_lists.filter(status="final")
 
-        items = (PurchaseListItem.objects
-                 .select_related("purchase_list__restaurant", "product__category", "unit")
-                 .filter(purchase_list__in=qs_lists))
+        items = PurchaseListItem.objects.filter(purchase_list__in=qs_lists)
 
         # ---- aplicar filtros si llegan ----
         filters = filters or {}
@@ -792,44 +933,118 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
         elif prod_names:
             items = items.filter(product__name__in=prod_names)
 
+        if mode == "summary":
+            # Sin líneas que emitir, los totales salen de dos GROUP BY en la
+            # BD en lugar de sumar Decimals ítem a ítem en Python. Round(…, 2)
+            # replica el redondeo por ítem del modo detail.
+            subtotal_sql = Case(
+                When(unit__is_currency=True, then=F("qty")),
+                default=F("qty") * F("price_soles"),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            )
+            rest_map = {}
+            grouped = (items
+                       .values("purchase_list__restaurant__name", "product__category__name")
+                       .annotate(total=Sum(Round(subtotal_sql, 2)))
+                       .order_by())
+            for g in grouped:
+                rest = g["purchase_list__restaurant__name"] or "Sin restaurante"
+                cat  = g["product__category__name"] or "Sin categoría"
+                t = (g["total"] or _D0).quantize(_Q01, rounding=ROUND_HALF_UP)
+                r = rest_map.setdefault(rest, {"categories": {}, "total": _D0})
+                r["categories"][cat] = t
+                r["total"] += t
+
+            grand_total = _D0
+            restaurants = []
+            for rname in sorted(rest_map.keys()):
+                rdata = rest_map[rname]
+                grand_total += rdata["total"]
+                restaurants.append({
+                    "restaurant": rname,
+                    "total": float(rdata["total"]),
+                    "categories": [
+                        {"category": cname, "total": float(rdata["categories"][cname])}
+                        for cname in sorted(rdata["categories"].keys())
+                    ],
+                })
+
+            by_date = (items
+                       .values("purchase_list__created_at__date")
+                       .annotate(total=Sum(Round(subtotal_sql, 2)),
+                                 lists=Count("purchase_list_id", distinct=True))
+                       .order_by("purchase_list__created_at__date"))
+            date_breakdown = [
+                {
+                    "date": g["purchase_list__created_at__date"].isoformat(),
+                    "lists": g["lists"],
+                    "total": float((g["total"] or _D0).quantize(_Q01, rounding=ROUND_HALF_UP)),
+                }
+                for g in by_date
+            ]
+
+            return {
+                "mode": mode,
+                "start": sdate.isoformat(),
+                "end": edate.isoformat(),
+                "only_final": only_final,
+                "grand_total": float(grand_total),
+                "restaurants": restaurants,
+                "dates": date_breakdown,
+            }
+
         # ---- resto igual que antes ----
         rest_map = {}
-        date_map = defaultdict(lambda: {"lists": set(), "total": Decimal("0.00")})
-        grand_total = Decimal("0.00")
-
-        for it in items:
-            rest = getattr(it.purchase_list.restaurant, "name", "Sin restaurante")
-            cat  = getattr(getattr(it.product, "category", None), "name", "Sin categoría")
+        date_map = defaultdict(lambda: {"lists": set(), "total": _D0})
+        grand_total = _D0
+
+        # Filas planas de .values(): los joins van en la misma consulta y no se
+        # materializa el grafo de modelos por ítem. iterator() + cursores del
+        # lado del servidor: la memoria queda acotada a un chunk aunque el
+        # rango tenga decenas de miles de ítems
+        rows = items.values(
+            "purchase_list_id", "purchase_list__created_at",
+            "purchase_list__restaurant__name",
+            "product__name", "product__category__name",
+            "unit__is_currency", "unit__symbol", "unit__name",
+            "qty", "price_soles",
+        )
+        for it in rows.iterator(chunk_size=2000):
+            rest = it["purchase_list__restaurant__name"] or "Sin restaurante"
+            cat  = it["product__category__name"] or "Sin categoría"
 
-            price = (it.price_soles or Decimal("0"))
-            qty   = (it.qty or Decimal("0"))
-            is_curr = bool(getattr(it.unit, "is_currency", False))
-            ulabel  = (getattr(it.unit, "symbol", None) or getattr(it.unit, "name", "")) or "-"
+            price = (it["price_soles"] or _D0)
+            qty   = (it["qty"] or _D0)
+            is_curr = bool(it["unit__is_currency"])
+            ulabel  = (it["unit__symbol"] or it["unit__name"] or "") or "-"
 
             raw_subtotal = qty if is_curr else (qty * price)
-            subtotal = raw_subtotal.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            subtotal = raw_subtotal.quantize(_Q01, rounding=ROUND_HALF_UP)
+
+            d = it["purchase_list__created_at"].date().isoformat()
 
-            r = rest_map.setdefault(rest, {"categories": {}, "total": Decimal("0.00")})
-            c = r["categories"].setdefault(cat, {"lines": [] if mode == "detail" else None, "total": Decimal("0.00")})
+            r = rest_map.setdefault(rest, {"categories": {}, "total": _D0})
+            c = r["categories"].setdefault(cat, {"lines": [] if mode == "detail" else None, "total": _D0})
 
             if mode == "detail":
                 c["lines"].append({
-                    "date": it.purchase_list.created_at.date().isoformat(),
-                    "product": it.product.name,
+                    "date": d,
+                    "product": it["product__name"],
                     "unit": ulabel,
                     "qty": float(qty),
-                    "price": None if is_curr else float(price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+                    "price": None if is_curr else float(price.quantize(_Q01, rounding=ROUND_HALF_UP)),
                     "subtotal": float(subtotal),
                     "unit_is_currency": is_curr,
                 })
 
-            c["total"] = (c["total"] + subtotal).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            r["total"] = (r["total"] + subtotal).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            grand_total = (grand_total + subtotal).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            # subtotal ya viene cuantizado a 2 decimales: acumular sin
+            # re-cuantizar (la emisión final cuantiza una vez por bucket).
+            c["total"] += subtotal
+            r["total"] += subtotal
+            grand_total += subtotal
 
-            d = it.purchase_list.created_at.date().isoformat()
-            date_map[d]["lists"].add(it.purchase_list_id)
-            date_map[d]["total"] = (date_map[d]["total"] + subtotal).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            date_map[d]["lists"].add(it["purchase_list_id"])
+            date_map[d]["total"] += subtotal
 
         restaurants = []
         for rname in sorted(rest_map.keys()):
@@ -838,7 +1053,7 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
                 cdata = rest_map[rname]["categories"][cname]
                 entry = {
                     "category": cname,
-                    "total": float(Decimal(cdata["total"]).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+                    "total": float(Decimal(cdata["total"]).quantize(_Q01, rounding=ROUND_HALF_UP)),
                 }
                 if mode == "detail":
                     entry["lines"] = cdata["lines"]
@@ -846,7 +1061,7 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
 
             restaurants.append({
                 "restaurant": rname,
-                "total": float(Decimal(rest_map[rname]["total"]).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+                "total": float(Decimal(rest_map[rname]["total"]).quantize(_Q01, rounding=ROUND_HALF_UP)),
                 "categories": cat_list,
             })
 
@@ -855,7 +1070,7 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
             date_breakdown.append({
                 "date": d,
                 "lists": len(date_map[d]["lists"]),
-                "total": float(Decimal(date_map[d]["total"]).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+                "total": float(Decimal(date_map[d]["total"]).quantize(_Q01, rounding=ROUND_HALF_UP)),
             })
 
         return {
@@ -863,7 +1078,7 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
             "start": sdate.isoformat(),
             "end": edate.isoformat(),
             "only_final": only_final,
-            "grand_total": float(grand_total.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)),
+            "grand_total": float(grand_total.quantize(_Q01, rounding=ROUND_HALF_UP)),
             "restaurants": restaurants,
             "dates": date_breakdown,
         }
@@ -936,15 +1151,22 @@ class PurchaseListViewSet(viewsets.ModelViewSet):
             "product_names": _collect_multi(request, "product_names", "products_names", "product", "product[]"),
         }
 
+        # Precargar WeasyPrint (import + fuentes) en paralelo con la consulta
+        # del rango: ambos son independientes y el warm-up es puro CPU/IO local
+        warm = _WARM_POOL.submit(_warm_weasyprint)
+
         payload = self._build_range_payload(sdate, edate, only_final, mode, filters=filters)
 
         # Render plantilla
         html = render_to_string("purchase_report.html", payload)
 
+        warm.result()
         pdf_bytes = None
         try:
             from weasyprint import HTML
-            pdf_bytes = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf()
+            pdf_bytes = HTML(string=html, base_url=request.build_absolute_uri("/")).write_pdf(
+                font_config=_weasy_font_config()
+            )
         except Exception:
             try:
                 from xhtml2pdf import pisa
@@ -1,16 +1,31 @@
 # seed.py
 from core.models import Unit, Category, Product, Restaurant
 
-# Unidades básicas
-Unit.objects.get_or_create(name="Soles", defaults={"kind": "currency", "symbol": "S/", "is_currency": True})
-Unit.objects.get_or_create(name="Kilogramo", defaults={"kind": "mass", "symbol": "kg"})
-Unit.objects.get_or_create(name="Gramo", defaults={"kind": "mass", "symbol": "g"})
-Unit.objects.get_or_create(name="Unidad", defaults={"kind": "count", "symbol": "uni"})
-Unit.objects.get_or_create(name="Paquete", defaults={"kind": "package", "symbol": "paq"})
+# Unidades básicas: un SELECT de existencia + un solo INSERT por lote
+# (bulk_create en vez de get_or_create fila a fila)
+units = [
+    Unit(name="Soles", kind="currency", symbol="S/", is_currency=True),
+    Unit(name="Kilogramo", kind="mass", symbol="kg"),
+    Unit(name="Gramo", kind="mass", symbol="g"),
+    Unit(name="Unidad", kind="count", symbol="uni"),
+    Unit(name="Paquete", kind="package", symbol="paq"),
+]
+existing = set(Unit.objects.filter(name__in=[u.name for u in units]).values_list("name", flat=True))
+Unit.objects.bulk_create(
+    [u for u in units if u.name not in existing],
+    batch_size=5000, ignore_conflicts=True,
+)
 
 # Restaurantes de prueba
-Restaurant.objects.get_or_create(name="Al Punto", code="ALP")
-Restaurant.objects.get_or_create(name="Mil Delicias", code="MIL")
-Restaurant.objects.get_or_create(name="Chimu", code="CHI")
+restaurants = [
+    Restaurant(name="Al Punto", code="ALP"),
+    Restaurant(name="Mil Delicias", code="MIL"),
+    Restaurant(name="Chimu", code="CHI"),
+]
+existing = set(Restaurant.objects.filter(name__in=[r.name for r in restaurants]).values_list("name", flat=True))
+Restaurant.objects.bulk_create(
+    [r for r in restaurants if r.name not in existing],
+    batch_size=5000, ignore_conflicts=True,
+)
 
 print("Datos iniciales creados ✅")
@@ -11,26 +11,18 @@ kg = Unit.objects.get(name="Kilogramo")
 uni = Unit.objects.get(name="Unidad")
 soles = Unit.objects.get(name="Soles")
 
-# Productos
-Product.objects.get_or_create(
-    name="Ají limo", category=verduras,
-    defaults={"default_unit": soles}
-)
-Product.objects.get_or_create(
-    name="Cebolla", category=verduras,
-    defaults={"default_unit": kg}
-)
-Product.objects.get_or_create(
-    name="Camotillo", category=pescados,
-    defaults={"default_unit": kg}
-)
-Product.objects.get_or_create(
-    name="Caballa", category=pescados,
-    defaults={"default_unit": kg}
-)
-Product.objects.get_or_create(
-    name="Azúcar", category=abarrotes,
-    defaults={"default_unit": kg}
+# Productos: un SELECT de existencia + un solo INSERT por lote
+products = [
+    Product(name="Ají limo", category=verduras, default_unit=soles),
+    Product(name="Cebolla", category=verduras, default_unit=kg),
+    Product(name="Camotillo", category=pescados, default_unit=kg),
+    Product(name="Caballa", category=pescados, default_unit=kg),
+    Product(name="Azúcar", category=abarrotes, default_unit=kg),
+]
+existing = set(Product.objects.filter(name__in=[p.name for p in products]).values_list("name", flat=True))
+Product.objects.bulk_create(
+    [p for p in products if p.name not in existing],
+    batch_size=5000, ignore_conflicts=True,
 )
 
 print("Categorías y productos iniciales creados ✅")